@@ -1,24 +1,37 @@
 import cv2
+import os
 import streamlit as st
 import tempfile as tf
+import threading
 
+from cv2.typing import MatLike
+from functools import lru_cache
 from pathlib import Path
-from core.algorithms import ALGORITHMS
-from core.draw import DRAWING
+from core.algorithms import ALGORITHMS, AlgorithmMetadata, AlgorithmScratch
+from core.draw import DRAWING, draw_overlay
+from core.video import FFmpegWriter, StaticFrameGate, open_capture, open_writer, process_video_threaded
 
 st.set_page_config(page_title="Big Brain Blob Tracker", layout="wide")
 
+N_WORKERS = os.cpu_count() or 1
+cv2.setNumThreads(N_WORKERS)
+
+# output codec -> (fourcc, file suffix, mime type)
+CODECS = {
+    "MJPG": ("MJPG", ".avi", "video/x-msvideo"),
+    "XVID": ("XVID", ".avi", "video/x-msvideo"),
+    "H264": ("avc1", ".mp4", "video/mp4"),  # piped to ffmpeg/libx264 when available
+}
+
 
 def bgr_to_hex(colour: tuple[int, int, int]) -> str:
     b, g, r = colour
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+@lru_cache(maxsize=64)
 def hex_to_bgr(hex_colour: str) -> tuple[int, int, int]:
-    hex_colour = hex_colour.lstrip("#")
-    r = int(hex_colour[0:2], 16)
-    g = int(hex_colour[2:4], 16)
-    b = int(hex_colour[4:6], 16)
+    r, g, b = bytes.fromhex(hex_colour.lstrip("#"))
     return (b, g, r)
 
 
@@ -46,6 +59,8 @@ with st.sidebar:
     if "margin" in algo.params:
         algo_params["margin"] = st.slider("Margin", 0.0, 1.0, 0.2, help="Intensity threshold as fraction of max") # fmt:skip
 
+    skip_static = st.checkbox("Skip Static Frames", False, help="Reuse detections while the frame barely changes") # fmt: skip
+
     st.divider()
 
     # visualisation
@@ -59,18 +74,27 @@ with st.sidebar:
         st.subheader("Star Settings")
         star_colour = st.color_picker("Star Colour", "#FFFF00")
         star_size = st.slider("Star Size", 1, 20, 10)
-        draw_params["stars"] = {"colour": hex_to_bgr(star_colour), "size": star_size}
+        star_antialias = st.checkbox("Star Antialias", False, help="Smoother but slower") # fmt: skip
+        draw_params["stars"] = {"colour": hex_to_bgr(star_colour), "size": star_size, "antialias": star_antialias} # fmt: skip
     if boxes_enabled:
         st.subheader("Box Settings")
         box_colour = st.color_picker("Box Colour", "#00FF00")
         box_thickness = st.slider("Box Thickness", 1, 10, 1)
-        draw_params["boxes"] = {"colour": hex_to_bgr(box_colour), "thickness": box_thickness} # fmt: skip
+        box_antialias = st.checkbox("Box Antialias", False, help="Smoother but slower") # fmt: skip
+        draw_params["boxes"] = {"colour": hex_to_bgr(box_colour), "thickness": box_thickness, "antialias": box_antialias} # fmt: skip
     if lines_enabled:
         st.subheader("Line Settings")
         line_colour = st.color_picker("Line Colour", "#FF0000")
         line_thickness = st.slider("Line Thickness", 1, 10, 1)
         draw_params["lines"] = {"colour": hex_to_bgr(line_colour), "thickness": line_thickness} # fmt: skip
 
+    st.divider()
+
+    # output
+
+    codec_selected = st.selectbox("Output Codec", list(CODECS.keys()), help="MJPG is the fastest to encode") # fmt: skip
+    codec_fourcc, codec_suffix, codec_mime = CODECS[codec_selected]
+
     st.divider()
     st.text("made for nami (with <3)")  # attribution <3
 
@@ -85,14 +109,14 @@ if uploaded_file is not None:
         temp_file.write(uploaded_file.read())
         input_path = temp_file.name
 
-    with tf.NamedTemporaryFile(delete=False, suffix=".avi") as output_file:
+    with tf.NamedTemporaryFile(delete=False, suffix=codec_suffix) as output_file:
         output_path = output_file.name
 
     st.success("File uploaded successfully!")
 
     progress = st.progress(0.0, "Ready to cook!")
     if st.button("LETS COOK 🍳"):
-        cap = cv2.VideoCapture(input_path)
+        cap = open_capture(input_path)
         if not cap.isOpened():
             st.error("Error: Could not open video.")
 
@@ -103,45 +127,60 @@ if uploaded_file is not None:
         w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-        fourcc = cv2.VideoWriter.fourcc(*"MJPG")
-        out = cv2.VideoWriter(output_path, fourcc, fps, (w, h))
+        if codec_selected == "H264" and FFmpegWriter.available():
+            out = FFmpegWriter(output_path, fps, (w, h))
+        else:
+            fourcc = cv2.VideoWriter.fourcc(*codec_fourcc)
+            out = open_writer(output_path, fourcc, fps, (w, h))
+        if not out.isOpened():
+            st.error(f"Error: Could not open {codec_selected} video writer.")
+            st.stop()
 
         n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        for i in range(n_frames):
-            ok, frame = cap.read()
-            if not ok:
-                st.error("Error: Could not read frame.")
-                break
 
-            # -- processing --
+        options = algo.options(**algo_params)
 
-            overlay = frame.copy()
-            options = algo.options(**algo_params)
-            metadata = algo.process_frame(frame, options) # fmt: skip
+        local = threading.local()  # one set of scratch buffers per worker thread
 
-            # -- drawing --
+        def detect(frame: MatLike) -> AlgorithmMetadata:
+            if not hasattr(local, "scratch"):
+                local.scratch = AlgorithmScratch()
+
+            scratch = local.scratch
+            if frame.ndim == 2:
+                gray = frame  # already converted by the static frame gate
+            else:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=scratch.get("gray", frame.shape[:2])) # fmt: skip
+            return algo.process_frame(gray, options, scratch)
 
-            if stars_enabled:
-                stars = DRAWING["stars"]
-                stars_options = stars.options(**draw_params.get("stars", {}))
-                stars.draw(overlay, metadata, stars_options, labels=metadata.get("labels")) # fmt: skip
+        # build the options of the enabled overlays once, not per frame
+        overlay_options = {name: DRAWING[name].options(**params) for name, params in draw_params.items()} # fmt: skip
+
+        def cook(i: int, frame: MatLike, metadata: AlgorithmMetadata) -> MatLike:
+            overlay = frame  # frame buffer is only recycled once written, so draw on it in place
+
+            # -- drawing --
 
-            if boxes_enabled:
-                boxes = DRAWING["boxes"]
-                boxes_options = boxes.options(**draw_params.get("boxes", {}))
-                boxes.draw(overlay, metadata, boxes_options, labels=metadata.get("labels")) # fmt: skip
+            draw_overlay(overlay, metadata, overlay_options, labels=metadata.get("labels")) # fmt: skip
 
-            if lines_enabled:
-                lines = DRAWING["lines"]
-                lines_options = lines.options(**draw_params.get("lines", {}))
-                lines.draw(overlay, metadata, lines_options)
+            if n_frames > 0:
+                progress.progress(min((i + 1) / n_frames, 1.0), f"Cooking frame {i + 1} / {n_frames}") # fmt: skip
 
-            progress.progress((i + 1) / n_frames, f"Cooking frame {i + 1} / {n_frames}")
+            return overlay
 
-            out.write(overlay)
+        gate = StaticFrameGate() if skip_static else None
+        try:
+            try:
+                n_cooked = process_video_threaded(cap, out, cook, process=detect, workers=N_WORKERS, gate=gate) # fmt: skip
+            finally:
+                cap.release()
+                out.release()  # flushes the encoder, raises if ffmpeg failed
+        except (OSError, RuntimeError) as e:
+            st.error(f"Error: Could not write video. {e}")
+            st.stop()
 
-        cap.release()
-        out.release()
+        if n_cooked < n_frames:
+            st.error("Error: Could not read frame.")
 
         progress.progress(1.0, "Cooking complete!")
         st.balloons()  # celebratations
@@ -151,6 +190,6 @@ if uploaded_file is not None:
             st.download_button(
                 label="DOWNLOAD COOKED VIDEO ⬇️",
                 data=output_file,
-                file_name="output.avi",
-                mime="video/x-msvideo",
+                file_name=f"output{codec_suffix}",
+                mime=codec_mime,
             )
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import Any, Callable, List, Optional, Type, TypedDict
+from typing import Any, Callable, List, Type, TypedDict
 
-from cv2.typing import MatLike
+import numpy as np
 
+from ._scratch import AlgorithmScratch
 from .otsu import OtsuOptions, process_frame as otsu_process_frame
 from .percentile import PercentileOptions, process_frame as percentile_process_frame
 from .peaks import PeaksOptions, process_frame as peaks_process_frame
@@ -10,9 +11,9 @@ from .fixed import FixedOptions, process_frame as fixed_process_frame
 
 
 class AlgorithmMetadata(TypedDict):
-    centers: list[tuple[int, int]]
-    boxes: list[tuple[int, int, int, int]]
-    areas: list[float]
+    centers: np.ndarray  # (N, 2) int32 cx, cy
+    boxes: np.ndarray  # (N, 4) int32 x, y, w, h
+    areas: np.ndarray  # (N,) float64
     labels: list[str]
 
 
@@ -22,7 +23,7 @@ class AlgorithmConfig:
 
     name: str
     options_class: Type[Any]
-    process_frame: Callable[[MatLike, Optional[Any]], AlgorithmMetadata]
+    process_frame: Callable[..., AlgorithmMetadata]
     params: List[str]
 
     def options(self, **kwargs):
@@ -77,4 +78,4 @@ ALGORITHMS = {
     ),
 }
 
-__all__ = ["AlgorithmMetadata", "AlgorithmConfig", "ALGORITHMS"]
+__all__ = ["AlgorithmMetadata", "AlgorithmConfig", "AlgorithmScratch", "ALGORITHMS"]
@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+import cv2
+from cv2.typing import MatLike
+
+
+@lru_cache(maxsize=None)
+def ellipse_kernel(size: int) -> MatLike:
+    """Return a cached elliptical structuring element of the given size."""
+
+    return cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+
+
+def subsample(image: MatLike, step: int = 4) -> MatLike:
+    """Return a nearest-neighbour subsample keeping every step-th pixel along each axis (at least 1x1)."""
+
+    h, w = image.shape[:2]
+    return cv2.resize(image, (max(1, w // step), max(1, h // step)), interpolation=cv2.INTER_NEAREST) # fmt: skip
@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+
+from cv2.typing import MatLike
+
+
+def extract_blobs(thresh: MatLike, min_area: int, max_area: int, precision: int = 1) -> dict: # fmt: skip
+    """
+    Extract blob geometry from a binary mask in a single connected components pass.
+
+    Args:
+        thresh: Binary thresholded image
+        min_area: Minimum blob area in pixels
+        max_area: Maximum blob area in pixels
+        precision: Number of decimals for the area in each label
+
+    Returns:
+        metadata: Dictionary with centers (N, 2), boxes (N, 4), areas (N,) and labels of the kept blobs
+    """
+
+    _, _, stats, _ = cv2.connectedComponentsWithStats(thresh, connectivity=8, ltype=cv2.CV_32S) # fmt: skip
+    stats = stats[1:]  # drop the background component
+
+    areas = stats[:, cv2.CC_STAT_AREA]
+    keep = (areas >= min_area) & (areas <= max_area)
+
+    # kept as (N, 2) / (N, 4) arrays, the draw functions take them as is
+    boxes = np.ascontiguousarray(stats[keep, :4])  # x, y, w, h
+    centers = boxes[:, :2] + boxes[:, 2:] // 2
+    areas = areas[keep].astype(np.float64)
+
+    return {
+        "centers": centers,
+        "boxes": boxes,
+        "areas": areas,
+        "labels": [f"{i} {a:.{precision}f}" for i, a in enumerate(areas.tolist())],
+    }
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class AlgorithmScratch:
+    """Reusable per-frame buffers for the thresholding pipelines (not thread-safe)."""
+
+    gray: Optional[np.ndarray] = None
+    blur: Optional[np.ndarray] = None
+    thresh: Optional[np.ndarray] = None
+    morph1: Optional[np.ndarray] = None
+    morph2: Optional[np.ndarray] = None
+    dist: Optional[np.ndarray] = None
+    dist_dil: Optional[np.ndarray] = None
+    eq: Optional[np.ndarray] = None
+    local_max: Optional[np.ndarray] = None
+
+    def get(self, name: str, shape: tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Return the named buffer, allocating it on first use or if its shape changed."""
+
+        buf = getattr(self, name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            setattr(self, name, buf)
+
+        return buf
@@ -4,8 +4,12 @@ from cv2.typing import MatLike
 from dataclasses import dataclass
 from typing import Optional
 
+from ._kernels import ellipse_kernel
+from ._post import extract_blobs
+from ._scratch import AlgorithmScratch
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class FixedOptions:
     """Options for fixed threshold algorithm."""
 
@@ -16,41 +20,47 @@ class FixedOptions:
     max_area: int = 86400  # Maximum contour area in pixels^2
 
 
-def fixed_thresholding(frame: MatLike, margin=0.7, blur_size=7, clean_size=3) -> MatLike: # fmt: skip
+def fixed_thresholding(frame: MatLike, margin=0.7, blur_size=7, clean_size=3, scratch: Optional[AlgorithmScratch] = None) -> MatLike: # fmt: skip
     """
     Apply fixed threshold with margin to a single frame.
 
     Args:
-        frame: Input BGR image
+        frame: Input BGR or grayscale image
         margin: Intensity threshold as fraction of max [0-1]
         blur_size: Size of Gaussian blur kernel (odd number)
         clean_size: Size of morphology kernel for cleaning
+        scratch: Reusable buffers for intermediate images (allocated if None)
 
     Returns:
         thresh: Binary thresholded image
     """
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (blur_size, blur_size), 0)
+    if scratch is None:
+        scratch = AlgorithmScratch()
+
+    shape = frame.shape[:2]
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=scratch.get("gray", shape)) # fmt: skip
+    blur = cv2.GaussianBlur(gray, (blur_size, blur_size), 0, dst=scratch.get("blur", shape)) # fmt: skip
 
     _, max_val, _, _ = cv2.minMaxLoc(blur)
     thresh_val = int(max_val * margin)
-    _, thresh = cv2.threshold(blur, thresh_val, 255, cv2.THRESH_BINARY)
+    _, thresh = cv2.threshold(blur, thresh_val, 255, cv2.THRESH_BINARY, dst=scratch.get("thresh", shape)) # fmt: skip
 
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (clean_size, clean_size))
-    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
-    thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel, iterations=2)
+    kernel = ellipse_kernel(clean_size)
+    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, dst=scratch.get("morph1", shape), iterations=2) # fmt: skip
+    thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel, dst=scratch.get("morph2", shape), iterations=2) # fmt: skip
 
     return thresh
 
 
-def process_frame(frame: MatLike, options: Optional[FixedOptions] = None):
+def process_frame(frame: MatLike, options: Optional[FixedOptions] = None, scratch: Optional[AlgorithmScratch] = None): # fmt: skip
     """
     Process a frame using fixed threshold with margin.
 
     Args:
-        frame: Input BGR image
+        frame: Input BGR or grayscale image
         options: FixedOptions instance with algorithm parameters (uses defaults if None)
+        scratch: Reusable buffers for intermediate images (allocated if None)
 
     Returns:
         binary_mask: Binary thresholded image
@@ -61,31 +71,5 @@ def process_frame(frame: MatLike, options: Optional[FixedOptions] = None):
     if options is None:
         options = FixedOptions()
 
-    thresh = fixed_thresholding(frame, options.margin, options.blur_size, options.clean_size) # fmt: skip
-    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-    centers = []
-    boxes = []
-    areas = []
-
-    for c in contours:
-        area = cv2.contourArea(c)
-        if area < options.min_area or area > options.max_area:
-            continue
-
-        x, y, w, h = cv2.boundingRect(c)
-        cx = x + w // 2
-        cy = y + h // 2
-
-        centers.append((cx, cy))
-        boxes.append((x, y, w, h))
-        areas.append(area)
-
-    metadata = {
-        "centers": centers,
-        "boxes": boxes,
-        "areas": areas,
-        "labels": [f"{i} {a:.1f}" for i, a in enumerate(areas)],
-    }
-
-    return metadata
+    thresh = fixed_thresholding(frame, options.margin, options.blur_size, options.clean_size, scratch) # fmt: skip
+    return extract_blobs(thresh, options.min_area, options.max_area)
@@ -5,8 +5,11 @@ from cv2.typing import MatLike
 from dataclasses import dataclass
 from typing import Optional
 
+from ._kernels import ellipse_kernel
+from ._scratch import AlgorithmScratch
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class PeaksOptions:
     """Options for local peak detection algorithm."""
 
@@ -16,54 +19,60 @@ class PeaksOptions:
     peak_size: int = 15  # Size of kernel for local peak detection
 
 
-def peaks_thresholding(frame: MatLike, margin=0.7, blur_size=5, clean_size=3, peak_size=15) -> tuple[MatLike, list[tuple[int, int]]]: # fmt: skip
+def peaks_thresholding(frame: MatLike, margin=0.7, blur_size=5, clean_size=3, peak_size=15, scratch: Optional[AlgorithmScratch] = None) -> tuple[MatLike, np.ndarray]: # fmt: skip
     """
     Apply local peak detection thresholding to a single frame.
 
     Args:
-        frame: Input BGR image
+        frame: Input BGR or grayscale image
         margin: Intensity threshold as fraction of max [0-1]
         blur_size: Size of Gaussian blur kernel (odd number)
         clean_size: Size of morphology kernel for cleaning
         peak_size: Size of kernel for local peak detection
+        scratch: Reusable buffers for intermediate images (allocated if None)
 
     Returns:
         thresh: Binary thresholded image
-        centers: List of (cx, cy) center coordinates of detected peaks
+        centers: (N, 2) array of (cx, cy) center coordinates of detected peaks
     """
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (blur_size, blur_size), 0)
+    if scratch is None:
+        scratch = AlgorithmScratch()
+
+    shape = frame.shape[:2]
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=scratch.get("gray", shape)) # fmt: skip
+    blur = cv2.GaussianBlur(gray, (blur_size, blur_size), 0, dst=scratch.get("blur", shape)) # fmt: skip
 
     _, max_val, _, _ = cv2.minMaxLoc(blur)
     thresh_val = int(max_val * margin)
-    _, thresh = cv2.threshold(blur, thresh_val, 255, cv2.THRESH_BINARY)
+    _, thresh = cv2.threshold(blur, thresh_val, 255, cv2.THRESH_BINARY, dst=scratch.get("thresh", shape)) # fmt: skip
 
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (clean_size, clean_size))
-    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=1)
+    kernel = ellipse_kernel(clean_size)
+    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, dst=scratch.get("morph1", shape), iterations=1) # fmt: skip
 
-    dist = cv2.distanceTransform(thresh, cv2.DIST_L2, 5)
-    peak_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (peak_size, peak_size))
-    dist_dil = cv2.dilate(dist, peak_kernel)
-    local_max = ((dist == dist_dil) & (dist > 0)).astype(np.uint8) * 255
+    dist = cv2.distanceTransform(thresh, cv2.DIST_L2, 5, dst=scratch.get("dist", shape, np.float32)) # fmt: skip
+    peak_kernel = ellipse_kernel(peak_size)
+    dist_dil = cv2.dilate(dist, peak_kernel, dst=scratch.get("dist_dil", shape, np.float32)) # fmt: skip
+    eq = cv2.compare(dist, dist_dil, cv2.CMP_EQ, dst=scratch.get("eq", shape))
+    # dist > 0 exactly where thresh is set, so mask with thresh instead of comparing
+    # against a scalar (which OpenCV misreads as a 4x1 array on 1x1 frames)
+    local_max = cv2.bitwise_and(eq, thresh, dst=scratch.get("local_max", shape))
 
-    n_labels, _, _, centroids = cv2.connectedComponentsWithStats(local_max, 8)
+    _, _, _, centroids = cv2.connectedComponentsWithStats(local_max, 8)
 
-    centers = []
-    for i in range(1, n_labels):
-        cx, cy = centroids[i]
-        centers.append((int(cx), int(cy)))
+    centers = centroids[1:].astype(np.int32)
 
     return thresh, centers
 
 
-def process_frame(frame: MatLike, options: Optional[PeaksOptions] = None):
+def process_frame(frame: MatLike, options: Optional[PeaksOptions] = None, scratch: Optional[AlgorithmScratch] = None): # fmt: skip
     """
     Process a frame using local peak detection.
 
     Args:
-        frame: Input BGR image
+        frame: Input BGR or grayscale image
         options: PeaksOptions instance with algorithm parameters (uses defaults if None)
+        scratch: Reusable buffers for intermediate images (allocated if None)
 
     Returns:
         binary_mask: Binary thresholded image
@@ -81,12 +90,13 @@ def process_frame(frame: MatLike, options: Optional[PeaksOptions] = None):
         options.blur_size,
         options.clean_size,
         options.peak_size,
+        scratch,
     )
 
     metadata = {
         "centers": centers,
-        "boxes": [],
-        "areas": [],
+        "boxes": np.empty((0, 4), np.int32),
+        "areas": np.empty(0),
         "labels": [],
     }
 
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Any, Callable, List, Type, Optional
 
+import numpy as np
 from cv2.typing import MatLike
 from ..algorithms import AlgorithmMetadata
 
@@ -17,6 +18,7 @@ class DrawConfig:
     options_class: Type[Any]
     draw: Callable[[MatLike, AlgorithmMetadata, Optional[Any]], None]
     params: List[str]
+    labelled: bool = False  # draw takes a labels keyword
 
     def options(self, **kwargs):
         return self.options_class(**kwargs)
@@ -27,6 +29,7 @@ DRAWING = {
         name="Stars",
         options_class=StarsOptions,
         draw=draw_stars,
+        labelled=True,
         params=[
             "size",
             "colour",
@@ -34,18 +37,21 @@ DRAWING = {
             "label_colour",
             "label_thickness",
             "font_scale",
+            "antialias",
         ],
     ),
     "boxes": DrawConfig(
         name="Boxes",
         options_class=BoxesOptions,
         draw=draw_boxes,
+        labelled=True,
         params=[
             "colour",
             "thickness",
             "label_colour",
             "label_thickness",
             "font_scale",
+            "antialias",
         ],
     ),
     "lines": DrawConfig(
@@ -60,4 +66,36 @@ DRAWING = {
     ),
 }
 
-__all__ = ["DrawConfig", "DRAWING"]
+
+def draw_overlay(frame: MatLike, metadata: AlgorithmMetadata, options: dict[str, Any], *, labels: Optional[list[str]] = None) -> None: # fmt: skip
+    """
+    Draw several overlays on a frame in one pass.
+
+    Centers and boxes are converted to arrays once for all overlays, and labels
+    are only drawn by the last labelled overlay instead of once per overlay.
+
+    Args:
+        frame: Image to draw on (modified in place)
+        metadata: Detections to draw
+        options: Options of each overlay to draw, keyed by DRAWING name (drawn in DRAWING order)
+        labels: Optional label for each detection
+    """
+
+    metadata = {
+        **metadata,
+        "centers": np.asarray(metadata["centers"], np.int32).reshape(-1, 2),
+        "boxes": np.asarray(metadata["boxes"], np.int32).reshape(-1, 4),
+    }
+
+    names = [name for name in DRAWING if name in options]
+    labelled = [name for name in names if DRAWING[name].labelled]
+
+    for name in names:
+        config = DRAWING[name]
+        if config.labelled:
+            config.draw(frame, metadata, options[name], labels=labels if name == labelled[-1] else None) # fmt: skip
+        else:
+            config.draw(frame, metadata, options[name])
+
+
+__all__ = ["DrawConfig", "DRAWING", "draw_overlay"]
@@ -0,0 +1,33 @@
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+
+def draw_labels(frame: MatLike, boxes: np.ndarray, labels: list[str], font_scale: float, colour: tuple[int, int, int], thickness: int, line_type: int) -> None: # fmt: skip
+    """
+    Draw one label per box, above the box or below it when too close to the top edge.
+
+    Args:
+        frame: Image to draw on (modified in place)
+        boxes: (N, 4) array of (x, y, w, h) boxes, one per label
+        labels: Label text for each box
+        font_scale: Font scale of the label text
+        colour: BGR colour of the label text
+        thickness: Thickness of the label text
+        line_type: OpenCV line type of the label text
+    """
+
+    tx = (boxes[:, 0] + 2).tolist()
+    ty = np.where(boxes[:, 1] > 12, boxes[:, 1] - 4, boxes[:, 1] + boxes[:, 3] + 12).tolist() # fmt: skip
+
+    for label, x, y in zip(labels, tx, ty):
+        cv2.putText(
+            frame,
+            label,
+            (x, y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            font_scale,
+            colour,
+            thickness,
+            line_type,
+        )
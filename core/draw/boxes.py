@@ -2,12 +2,14 @@ from dataclasses import dataclass
 from typing import Optional
 
 import cv2
+import numpy as np
 from cv2.typing import MatLike
 
 from ..algorithms import AlgorithmMetadata
+from ._labels import draw_labels
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BoxesOptions:
     """Options for drawing bounding boxes."""
 
@@ -16,6 +18,7 @@ class BoxesOptions:
     label_colour: tuple[int, int, int] = (255, 255, 255)
     label_thickness: int = 1
     font_scale: float = 0.4
+    antialias: bool = False  # LINE_AA is several times slower than LINE_8
 
 
 def draw_frame(
@@ -30,33 +33,28 @@ def draw_frame(
     if options is None:
         options = BoxesOptions()
 
-    boxes = metadata["boxes"]
-
-    for i, (x, y, w, h) in enumerate(boxes):
-        cv2.rectangle(
-            frame,
-            (x, y),
-            (x + w, y + h),
-            options.colour,
-            options.thickness,
-            cv2.LINE_AA,
-        )
-
-        if labels is None:
-            continue
-
-        label = labels[i]
-
-        tx = x + 2
-        ty = y - 4 if y > 12 else y + h + 12
-
-        cv2.putText(
-            frame,
-            label,
-            (tx, ty),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            options.font_scale,
-            options.label_colour,
-            options.label_thickness,
-            cv2.LINE_AA,
-        )
+    line_type = cv2.LINE_AA if options.antialias else cv2.LINE_8
+
+    # accepts an (N, 4) array or a list of (x, y, w, h) tuples
+    b = np.asarray(metadata["boxes"], np.int32).reshape(-1, 4)
+
+    # rectangles are closed 4-point polylines, so draw every box in one call
+    x0, y0 = b[:, 0], b[:, 1]
+    x1, y1 = x0 + b[:, 2], y0 + b[:, 3]
+    corners = np.empty((len(b), 4, 1, 2), np.int32)
+    corners[:, :, 0, 0] = np.stack([x0, x1, x1, x0], axis=1)
+    corners[:, :, 0, 1] = np.stack([y0, y0, y1, y1], axis=1)
+    cv2.polylines(
+        frame,
+        list(corners),
+        True,
+        options.colour,
+        options.thickness,
+        line_type,
+    )
+
+    if labels is None:
+        return
+
+    # labels go on top of every box, not just the ones drawn before them
+    draw_labels(frame, b, labels, options.font_scale, options.label_colour, options.label_thickness, line_type) # fmt: skip
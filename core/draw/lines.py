@@ -1,13 +1,15 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 import cv2
+import numpy as np
 from cv2.typing import MatLike
 
 from ..algorithms import AlgorithmMetadata
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LinesOptions:
     """Options for drawing connecting lines."""
 
@@ -16,6 +18,75 @@ class LinesOptions:
     thickness: int = 1
 
 
+_BLOCK = 1024  # ranked pairs checked per NumPy filter pass in _select_edges
+
+
+@lru_cache(maxsize=8)
+def _pair_indices(n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the (i, j) indices of every pair with i < j; n is usually stable across frames."""
+
+    iu, ju = np.triu_indices(n, k=1)
+    iu.flags.writeable = False  # shared between calls
+    ju.flags.writeable = False
+
+    return iu, ju
+
+
+def _select_edges(iu: np.ndarray, ju: np.ndarray, d2: np.ndarray, degree: int, n: int) -> list[tuple[int, int]]: # fmt: skip
+    """Greedily pick the shortest pairs, capping each node at degree edges."""
+
+    deg = [0] * n
+    picks = []
+    if degree <= 0:
+        return picks
+
+    # a pair is only ever rejected because one end is full, and full nodes stay full,
+    # so once every pair of open nodes is already an edge nothing later can be drawn
+    adj = [[] for _ in range(n)]
+    full = [False] * n
+    full_mask = np.zeros(n, bool)  # same as full, for dropping dead pairs in bulk
+    n_open = n  # nodes that can still take an edge
+    open_edges = 0  # picked edges between two open nodes
+
+    # sorting d2 * m + index orders pairs exactly like a stable argsort of d2, ties in
+    # (i, j) order, but an in-place int64 sort is several times faster than the merge
+    # sort behind kind="stable" (d2 < 2**31 and m < 2**32 keep the key below 2**63)
+    m = d2.size
+    key = d2.astype(np.int64)
+    key *= m
+    key += np.arange(m)
+    key.sort()
+    order = key % m
+    ii, jj = iu[order], ju[order]
+
+    # most pairs late in the order touch a full node, so each block is filtered in
+    # NumPy first and only the pairs that could still be drawn are walked in Python
+    for start in range(0, order.size, _BLOCK):
+        bi, bj = ii[start : start + _BLOCK], jj[start : start + _BLOCK]
+        live = ~(full_mask[bi] | full_mask[bj])
+
+        for i, j in zip(bi[live].tolist(), bj[live].tolist()):
+            if full[i] or full[j]:
+                continue
+
+            picks.append((i, j))
+            adj[i].append(j)
+            adj[j].append(i)
+            open_edges += 1
+
+            for v in (i, j):
+                deg[v] += 1
+                if deg[v] == degree:
+                    full[v] = full_mask[v] = True
+                    n_open -= 1
+                    open_edges -= sum(not full[u] for u in adj[v])
+
+            if open_edges == n_open * (n_open - 1) // 2:
+                return picks
+
+    return picks
+
+
 def draw_frame(
     frame: MatLike,
     metadata: AlgorithmMetadata,
@@ -26,31 +97,33 @@ def draw_frame(
     if options is None:
         options = LinesOptions()
 
-    centers = metadata["centers"]
-
-    pairs = []
-    for i, (xi, yi) in enumerate(centers):
-        for j in range(i + 1, len(centers)):
-            xj, yj = centers[j]
-            dx = xi - xj
-            dy = yi - yj
-            d2 = dx * dx + dy * dy
-            pairs.append((d2, i, j))
-
-    pairs.sort(key=lambda t: t[0])
-
-    deg = [0] * len(centers)
-    for _, i, j in pairs:
-        if deg[i] >= options.degree or deg[j] >= options.degree:
-            continue
-
-        cv2.line(
-            frame,
-            centers[i],
-            centers[j],
-            options.colour,
-            options.thickness,
-        )
-
-        deg[i] += 1
-        deg[j] += 1
+    # accepts an (N, 2) array or a list of (cx, cy) tuples
+    pts = np.asarray(metadata["centers"], np.int32).reshape(-1, 2)
+    n = len(pts)
+    if n < 2 or options.degree <= 0:
+        return
+
+    # only the upper triangle is needed, so never build the full (n, n, 2) diff
+    iu, ju = _pair_indices(n)
+
+    if options.degree >= n - 1:
+        # every node can take every edge, so all pairs are drawn and order does not matter
+        edges = np.stack([iu, ju], axis=1)
+    else:
+        xs, ys = pts[:, 0], pts[:, 1]
+        dx = xs[iu] - xs[ju]
+        dy = ys[iu] - ys[ju]
+        d2 = dx * dx + dy * dy
+
+        # ties are ranked in (i, j) order, same as sorting the pair list
+        edges = np.array(_select_edges(iu, ju, d2, options.degree, n), np.intp).reshape(-1, 2) # fmt: skip
+
+    # each edge is a 2-vertex open polyline, so every line is drawn in one call
+    segments = pts[edges].reshape(-1, 2, 1, 2)
+    cv2.polylines(
+        frame,
+        list(segments),
+        False,
+        options.colour,
+        options.thickness,
+    )
@@ -0,0 +1,288 @@
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+import cv2
+from cv2.typing import MatLike
+
+
+def open_capture(path: str) -> cv2.VideoCapture:
+    """
+    Open a video for reading, preferring hardware accelerated decoding.
+
+    Falls back to the default backend if FFmpeg cannot open the file.
+    """
+
+    params = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG, params)
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(path)
+
+    return cap
+
+
+def open_writer(path: str, fourcc: int, fps: float, size: tuple[int, int]) -> cv2.VideoWriter: # fmt: skip
+    """
+    Open a video for writing, preferring hardware accelerated encoding.
+
+    Falls back to the default backend if FFmpeg cannot open the file.
+    """
+
+    params = [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    out = cv2.VideoWriter(path, cv2.CAP_FFMPEG, fourcc, fps, size, params)
+    if not out.isOpened():
+        out = cv2.VideoWriter(path, fourcc, fps, size)
+
+    return out
+
+
+class FFmpegWriter:
+    """
+    Drop-in for cv2.VideoWriter that pipes raw BGR frames into an ffmpeg process.
+
+    Lets the encoder and preset be chosen explicitly (libx264 ultrafast by default)
+    instead of whatever the OpenCV build maps a fourcc to.
+    """
+
+    def __init__(self, path: str, fps: float, size: tuple[int, int], codec: str = "libx264", preset: str = "ultrafast"): # fmt: skip
+        w, h = size
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{w}x{h}", "-r", str(fps), "-i", "-",
+            "-c:v", codec, "-preset", preset, "-pix_fmt", "yuv420p",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # yuv420p needs even dimensions
+            path,
+        ]  # fmt: skip
+
+        self.log = tempfile.TemporaryFile()  # a file rather than a pipe, so ffmpeg never blocks on it
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=self.log, bufsize=10 * w * h * 3) # fmt: skip
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def available(codec: str = "libx264") -> bool:
+        """Return whether an ffmpeg executable with the given encoder is on the PATH."""
+
+        if shutil.which("ffmpeg") is None:
+            return False
+
+        # ffmpeg only reports a missing encoder once it has input, so check up front
+        encoders = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True) # fmt: skip
+        return any(line.split()[1:2] == [codec] for line in encoders.stdout.splitlines())
+
+    def isOpened(self) -> bool:
+        return self.proc.poll() is None
+
+    def write(self, frame: MatLike) -> None:
+        try:
+            self.proc.stdin.write(frame.tobytes())
+        except BrokenPipeError:
+            self.proc.wait()
+            raise RuntimeError(self._failure()) from None
+
+    def release(self) -> None:
+        """
+        Flush the remaining frames and wait for ffmpeg to finish.
+
+        Raises:
+            RuntimeError: If ffmpeg failed, with its error output
+        """
+
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass  # ffmpeg already exited, reported below
+        if self.proc.wait() != 0:
+            raise RuntimeError(self._failure())
+
+    def _failure(self) -> str:
+        self.log.seek(0)
+        message = self.log.read().decode(errors="replace").strip()
+        return f"ffmpeg exited with code {self.proc.returncode}" + (f": {message}" if message else "") # fmt: skip
+
+
+class StaticFrameGate:
+    """
+    Tell whether a frame changed enough since the last frame that was let through.
+
+    Frames are compared against the last changed frame rather than the previous
+    one, so a slow drift still triggers once it adds up. Changed frames are
+    returned in grayscale, so the detector can use them without converting again.
+    """
+
+    def __init__(self, threshold: int = 3, min_changed: float = 0.005):
+        self.threshold = threshold  # Per-pixel intensity difference that counts as a change
+        self.min_changed = min_changed  # Fraction of changed pixels that counts as a new frame
+        self.ref: Optional[MatLike] = None
+
+    def __call__(self, frame: MatLike) -> Optional[MatLike]:
+        """Return the grayscale frame if it changed enough, otherwise None."""
+
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.ref is None or self.ref.shape != gray.shape:
+            self.ref = gray
+            return gray
+
+        diff = cv2.absdiff(gray, self.ref)
+        _, diff = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY, dst=diff)
+        if cv2.countNonZero(diff) < self.min_changed * diff.size:
+            return None
+
+        self.ref = gray
+        return gray
+
+
+def process_video_threaded(
+    cap: cv2.VideoCapture,
+    out: cv2.VideoWriter | FFmpegWriter,
+    callback: Callable[..., MatLike],
+    prefetch: int = 8,
+    *,
+    process: Optional[Callable[[MatLike], Any]] = None,
+    workers: int = 1,
+    gate: Optional[Callable[[MatLike], Optional[MatLike]]] = None,
+) -> int:
+    """
+    Run a video through a threaded decode -> process -> encode pipeline.
+
+    Decoding and encoding each run on their own thread and are connected to the
+    caller by bounded queues, so reading and writing overlap with processing.
+    Frame buffers are recycled once written, so the callback may draw on the
+    frame in place but must not keep a reference to it.
+    The callback always runs on the calling thread, so any state it keeps (and
+    any UI updates it makes) stays on that thread.
+
+    If process is given it must be pure; it is run on a pool of worker threads
+    with up to workers frames in flight, and its result is passed to the
+    callback in frame order as callback(i, frame, result). If gate is also given
+    it is called on the calling thread for every frame, in order. What it returns
+    is passed to process in place of the frame (such as the grayscale image it
+    already computed), and frames it rejects by returning None skip process and
+    reuse the result of the frame before them.
+
+    Args:
+        cap: Opened capture to read frames from (read until EOF)
+        out: Opened writer to write processed frames to
+        callback: Called as callback(i, frame) for every frame, returns the frame to write
+        prefetch: Maximum number of frames buffered between stages
+        process: Optional per-frame function run in parallel ahead of the callback
+        workers: Number of worker threads for process
+        gate: Optional check that returns the input for process, or None to skip the frame
+
+    Returns:
+        n_frames: Number of frames processed
+    """
+
+    read_q: queue.Queue = queue.Queue(maxsize=prefetch)
+    write_q: queue.Queue = queue.Queue(maxsize=prefetch)
+    free_q: queue.Queue = queue.Queue()  # written frames, decoded into again
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def get(q: queue.Queue):
+        # blocking get that gives up once the pipeline is stopped and drained
+        while True:
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    return None
+
+    def put(q: queue.Queue, item) -> bool:
+        # blocking put that gives up once the pipeline is stopped
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader() -> None:
+        try:
+            i = 0
+            while not stop.is_set():
+                try:
+                    buf = free_q.get_nowait()
+                except queue.Empty:
+                    buf = None  # nothing written back yet, let cap.read allocate
+                ok, frame = cap.read(buf)
+                if not ok:
+                    break
+                if not put(read_q, (i, frame)):
+                    return
+                i += 1
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            put(read_q, None)  # always end the stream, or the caller waits forever
+
+    def writer() -> None:
+        try:
+            while (item := write_q.get()) is not None:
+                frame, buf = item
+                out.write(frame)
+                free_q.put(buf)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            while write_q.get() is not None:
+                pass  # keep draining so the caller never blocks on a full queue
+
+    threads = [
+        threading.Thread(target=reader, daemon=True),
+        threading.Thread(target=writer, daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    n_frames = 0
+    try:
+        if process is None:
+            while (item := get(read_q)) is not None:
+                i, frame = item
+                write_q.put((callback(i, frame), frame))
+                n_frames += 1
+        else:
+            pending: deque = deque()
+            result = None
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+
+                def drain(limit: int) -> int:
+                    nonlocal result
+                    n = 0
+                    while len(pending) > limit:
+                        i, frame, future = pending.popleft()
+                        if future is not None:
+                            result = future.result()
+                        write_q.put((callback(i, frame, result), frame))
+                        n += 1
+                    return n
+
+                while (item := get(read_q)) is not None:
+                    i, frame = item
+                    if gate is None:
+                        future = executor.submit(process, frame)
+                    elif (gated := gate(frame)) is not None:
+                        future = executor.submit(process, gated)
+                    else:
+                        future = None  # reuse the previous result
+                    pending.append((i, frame, future))
+                    n_frames += drain(workers)
+                n_frames += drain(0)
+    finally:
+        stop.set()
+        write_q.put(None)
+        for t in threads:
+            t.join()
+
+    if errors:
+        raise errors[0]
+
+    return n_frames